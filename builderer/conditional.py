@@ -47,20 +47,26 @@ class Condition:
 
 
 class Case:
+    __slots__ = ("condition", "values")
+
     def __init__(self, condition: Condition, *value: str):
         self.condition = condition
-        self.values = [*value]
+        self.values = value
 
 
 class ConditionalValue:
+    __slots__ = ()
+
     def __call__(self, config: Config, permissive: bool = False):
         raise RuntimeError(f"{type(self)} must implement __call__")
 
 
 class Optional(ConditionalValue):
+    __slots__ = ("condition", "values")
+
     def __init__(self, condition: Condition, *value: str):
         self.condition = condition
-        self.values = [*value]
+        self.values = value
 
     def __call__(self, config: Config, permissive: bool = False):
         if permissive and not self.condition.can_expand(config):
@@ -71,8 +77,10 @@ class Optional(ConditionalValue):
 
 
 class Switch(ConditionalValue):
+    __slots__ = ("cases",)
+
     def __init__(self, *cases: Case):
-        self.cases: list[Case] = list(cases)
+        self.cases = cases
 
     def __call__(self, config: Config, permissive: bool = False):
         for case in self.cases:
@@ -11,7 +11,7 @@ class Config:
         build_root: str,
         build_config: Union[str, list[str]],
         architecture: Union[str, list[str]],
-        **kwargs
+        **kwargs,
     ):
         self.buildtool = buildtool
         self.toolchain = toolchain
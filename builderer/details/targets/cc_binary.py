@@ -14,7 +14,7 @@ class CCBinary(BuildTarget):
         private_defines: list = [],
         private_includes: list = [],
         output_path: Optional[str] = None,
-        **kwargs
+        **kwargs,
     ):
         super().__init__(**kwargs)
         self.srcs = srcs
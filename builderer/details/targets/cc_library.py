@@ -9,6 +9,10 @@ from typing import Iterator, Tuple, Optional
 from builderer.details.targets.target import BuildTarget
 
 
+def get_relative_paths(files, root):
+    return [os.path.relpath(f, root) for f in files]
+
+
 class CCLibrary(BuildTarget):
     def __init__(
         self,
@@ -49,10 +53,6 @@ class CCLibrary(BuildTarget):
 
     def do_pre_build(self):
         assert self.sandbox_root
-
-        def get_relative_paths(files, root):
-            return [os.path.relpath(f, root) for f in files]
-
         # Compute common paths for each path group...
         group_paths = defaultdict(list)
         for group, paths in self.get_file_path_fields():
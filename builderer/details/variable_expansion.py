@@ -1,25 +1,47 @@
+from typing import Any, Dict, Tuple
+
 from builderer import Config, ConditionalValue
 
 
-def resolve_conditionals(config: Config, value, permissive: bool = False):
-    def visit(inner_value):
-        if isinstance(inner_value, ConditionalValue):
-            yield from inner_value(config=config, permissive=permissive)
-        else:
-            yield resolve_conditionals(
-                config=config, value=inner_value, permissive=permissive
-            )
+def _visit_conditionals(config: Config, value, permissive: bool):
+    # Most values are plain strings, pass them straight through...
+    if type(value) is str:
+        yield value
+    elif isinstance(value, ConditionalValue):
+        yield from value(config=config, permissive=permissive)
+    else:
+        yield resolve_conditionals(config=config, value=value, permissive=permissive)
+
 
+def resolve_conditionals(config: Config, value, permissive: bool = False):
     if isinstance(value, list):
-        return [r for v in value for r in visit(v)]
+        return [r for v in value for r in _visit_conditionals(config, v, permissive)]
     elif isinstance(value, ConditionalValue):
-        resolved = list(visit(value))
+        resolved = list(_visit_conditionals(config, value, permissive))
         assert len(resolved) == 1
         return resolved[0]
     else:
         return value
 
 
+# Memoized resolve_conditionals for a single baked config. Generators resolve
+# the same target fields many times (e.g. a library's public_defines once for
+# every dependent target), so results are cached by the identity of the value
+# being resolved. Cached results are shared and must not be mutated.
+class ConditionalResolver:
+    def __init__(self, config: Config):
+        self.config = config
+        # Entries keep a reference to the original value so its id stays unique
+        self._cache: Dict[int, Tuple[Any, Any]] = {}
+
+    def __call__(self, value):
+        key = id(value)
+        if key not in self._cache:
+            resolved = resolve_conditionals(config=self.config, value=value)
+            self._cache[key] = (value, resolved)
+        return self._cache[key][1]
+
+
 def resolve_variables(config: Config, variables: dict, value):
     if isinstance(value, list):
         return [
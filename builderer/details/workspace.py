@@ -2,6 +2,7 @@ import hashlib
 import os
 import pickle
 
+from collections import deque
 from graphlib import TopologicalSorter
 from importlib.machinery import SourceFileLoader
 from importlib.util import spec_from_loader, module_from_spec
@@ -53,6 +54,8 @@ def load_recursive_contexts(
 
 
 class PackageFormatHelper:
+    __slots__ = ("root", "pkg")
+
     def __init__(self, root, pkg):
         self.root = root
         self.pkg = pkg
@@ -83,7 +86,14 @@ class Workspace:
             for pkg in ctx.packages.values()
         }
         # Initialize empty graph, won't be able to fill it in until conditionals are expanded
-        self._graph: dict[tuple[Package, Target], list[tuple[Package, Target]]] = {}
+        self._graph: dict[
+            tuple[Package, Target], tuple[tuple[Package, Target], ...]
+        ] = {}
+        # Transitive dependencies are walked repeatedly by the generators (per
+        # target and per build config), so cache them until the graph changes
+        self._all_dependencies: dict[
+            tuple[Package, Target], list[tuple[Package, Target]]
+        ] = {}
 
     @property
     def targets(self):
@@ -112,9 +122,11 @@ class Workspace:
     def all_dependencies(
         self, package: Package, target: Target
     ) -> Iterator[tuple[Package, Target]]:
-        direct = [(p, t) for p, t in self.direct_dependencies(package, target)]
-        for package, target in self._breadth_first(direct):
-            yield package, target
+        key = (package, target)
+        if key not in self._all_dependencies:
+            direct = [(p, t) for p, t in self.direct_dependencies(package, target)]
+            self._all_dependencies[key] = list(self._breadth_first(direct))
+        yield from self._all_dependencies[key]
 
     # Configure the workspace to the given build profile, this includes
     # collapsing conditional fields, expanding variables, and filtering out
@@ -149,14 +161,15 @@ class Workspace:
             self._configure_sandbox(config=config, target=target)
             # Expand format variables
             self._expand_variables(config=config, target=target)
-            # Glob path variables...
+            # Glob path variables, dropping duplicates from overlapping patterns
+            # while keeping the order they were first matched in...
             target_root = Path(target.workspace_root)
             for _, attr in target.get_all_path_fields():
-                attr[:] = [
+                attr[:] = dict.fromkeys(
                     src.as_posix()
                     for pattern in attr
                     for src in target_root.glob(pattern)
-                ]
+                )
             # Perform pre-build tasks (e.g. sandboxing, code generation, etc)...
             if target.sandbox:
                 target.do_pre_build()
@@ -208,19 +221,22 @@ class Workspace:
 
     def _update_graph(self):
         self._graph = {
-            (package, target): [self.find_target(dep, package) for dep in target.deps]
+            (package, target): tuple(
+                self.find_target(dep, package) for dep in target.deps
+            )
             for package, target in self.targets
         }
+        self._all_dependencies = {}
 
     def _breadth_first(self, start: list[tuple[Package, Target]]):
-        visited = {k: False for k in self._graph.keys()}
-        queue = start
+        visited: set[tuple[Package, Target]] = set()
+        queue = deque(start)
         while queue:
-            m = queue.pop(0)
+            m = queue.popleft()
             yield m
             for dep in self._graph[m]:
-                if not visited[dep]:
-                    visited[dep] = True
+                if dep not in visited:
+                    visited.add(dep)
                     queue.append(dep)
 
     def _topological_sort(self):
@@ -4,10 +4,16 @@ from pathlib import Path
 from builderer import Config
 from builderer.details.as_iterator import str_iter
 from builderer.details.targets.target import BuildTarget
+from builderer.details.variable_expansion import ConditionalResolver
 from builderer.details.workspace import Workspace
 from builderer.generators.make.root_makefile import RootMakefile
 from builderer.generators.make.target_mk import TargetMk
-from builderer.generators.make.utils import build_config_root, is_header_only_library
+from builderer.generators.make.utils import (
+    build_config_root,
+    cc_output_path,
+    is_header_only_library,
+    sorted_cc_dependencies,
+)
 
 SUPPORTED_TOOLCHAINS = ["clang", "gcc"]
 SUPPORTED_PLATFORMS = ["linux", "macos"]
@@ -63,19 +69,46 @@ class MakeGenerator:
                 raise ValueError(f"unsupported architecture {arch}")
 
     def __call__(self):
-        makefile = RootMakefile(config=self.base_config, workspace=self.workspace)
+        # Only targets that produce build output get a makefile, this doesn't
+        # depend on the config so filter once up front...
+        build_targets = [
+            (package, target)
+            for package, target in self.workspace.targets
+            if isinstance(target, BuildTarget) and not is_header_only_library(target)
+        ]
+        makefile = RootMakefile(
+            config=self.base_config,
+            workspace=self.workspace,
+            build_targets=build_targets,
+        )
         makefile()
         configs = [
             bake_config(self.base_config, architecture=a, build_config=c)
             for a in str_iter(self.base_config.architecture)
             for c in str_iter(self.base_config.build_config)
         ]
+        # Dependency order is also config independent...
+        cc_dependencies = {
+            (package, target): sorted_cc_dependencies(
+                workspace=self.workspace, package=package, target=target
+            )
+            for package, target in build_targets
+        }
         for config in configs:
             mk_root = Path(
                 build_config_root(
                     config.build_root, config.architecture, config.build_config
                 )
             )
+            # Output paths are needed both by each target and by everything
+            # that links against it, so resolve them once per config...
+            output_paths = {
+                (package, target): cc_output_path(
+                    config=config, package=package, target=target
+                )
+                for package, target in build_targets
+            }
+            resolve = ConditionalResolver(config)
             target_mks = [
                 TargetMk(
                     config=config,
@@ -83,10 +116,11 @@ class MakeGenerator:
                     build_root=mk_root,
                     package=package,
                     target=target,
+                    output_paths=output_paths,
+                    resolve=resolve,
+                    cc_dependencies=cc_dependencies[(package, target)],
                 )
-                for package, target in self.workspace.targets
-                if isinstance(target, BuildTarget)
-                and not is_header_only_library(target)
+                for package, target in build_targets
             ]
             for mk in target_mks:
                 mk()
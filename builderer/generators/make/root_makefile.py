@@ -1,39 +1,42 @@
 import os
 
-from io import TextIOWrapper
+from io import StringIO
 from pathlib import Path
+from typing import List, TextIO, Tuple
 
 from builderer import Config
 from builderer.details.as_iterator import str_iter
+from builderer.details.package import Package
 from builderer.details.targets.target import BuildTarget
 from builderer.details.workspace import Workspace
 from builderer.generators.make.utils import (
     build_config_root,
     mk_target_build_path,
     phony_target_name,
-    is_header_only_library,
+    write_if_changed,
 )
 
 
 class RootMakefile:
-    def __init__(self, config: Config, workspace: Workspace):
+    def __init__(
+        self,
+        config: Config,
+        workspace: Workspace,
+        build_targets: List[Tuple[Package, BuildTarget]],
+    ):
         self.config = config
         self.workspace = workspace
+        self.build_targets = build_targets
         self.root = Path(self.config.build_root)
         self.path = self.root.joinpath("Makefile")
 
     def __call__(self):
         self.root.mkdir(parents=True, exist_ok=True)
-        with open(self.path, "w") as file:
-            self._write_makefile(file)
-
-    def _write_makefile(self, file: TextIOWrapper):
-        build_targets = [
-            (package, target)
-            for package, target in self.workspace.targets
-            if isinstance(target, BuildTarget) and not is_header_only_library(target)
-        ]
+        file = StringIO()
+        self._write_makefile(file)
+        write_if_changed(self.path, file.getvalue())
 
+    def _write_makefile(self, file: TextIO):
         # header
         file.writelines(
             [
@@ -102,11 +105,16 @@ class RootMakefile:
         )
 
         # build
-        file.write("build: ")
-        for package, target in build_targets:
-            mk_name = phony_target_name(package=package, target=target)
-            file.write(f"\\\n  {mk_name} ")
-        file.write("\n\n")
+        file.writelines(
+            [
+                "build: ",
+                *[
+                    f"\\\n  {phony_target_name(package=package, target=target)} "
+                    for package, target in self.build_targets
+                ],
+                "\n\n",
+            ]
+        )
 
         # phony targets
         file.writelines(
@@ -118,8 +126,7 @@ class RootMakefile:
         )
 
         # include target makefiles...
-        for package, target in build_targets:
-            mk_path = mk_target_build_path(package=package, target=target)
-            file.write(
-                f"include $(abspath $(BUILD_CONFIG_ROOT)/{mk_path.as_posix()})\n"
-            )
+        file.writelines(
+            f"include $(abspath $(BUILD_CONFIG_ROOT)/{mk_target_build_path(package=package, target=target).as_posix()})\n"
+            for package, target in self.build_targets
+        )
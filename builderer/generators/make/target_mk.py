@@ -1,19 +1,16 @@
 import os
 
-from graphlib import TopologicalSorter
+from io import StringIO
 from pathlib import Path
 
 from builderer.details.targets.cc_binary import CCBinary
 from builderer.details.targets.cc_library import CCLibrary
-from builderer.details.variable_expansion import resolve_conditionals
-from builderer.details.workspace import target_full_name
 from builderer.generators.make.utils import (
     mk_target_build_path,
     phony_target_name,
     is_header_only_library,
-    cc_library_output_path,
-    cc_binary_output_path,
     is_apple_platform,
+    write_if_changed,
 )
 
 CC_EXTS = {
@@ -64,11 +61,43 @@ PLATFORM_ARCH_FLAGS = {
 
 
 class TargetMk:
-    def __init__(self, config, workspace, build_root, package, target):
+    __slots__ = (
+        "config",
+        "workspace",
+        "package",
+        "target",
+        "is_library",
+        "is_binary",
+        "output_paths",
+        "var_suffix",
+        "out_path",
+        "resolve",
+        "cc_dependencies",
+        "path",
+    )
+
+    def __init__(
+        self,
+        config,
+        workspace,
+        build_root,
+        package,
+        target,
+        output_paths,
+        resolve,
+        cc_dependencies,
+    ):
         self.config = config
         self.workspace = workspace
         self.package = package
         self.target = target
+        self.is_library = isinstance(target, CCLibrary)
+        self.is_binary = isinstance(target, CCBinary)
+        self.output_paths = output_paths
+        self.var_suffix = f"{package.name.replace('/','_')}__{target.name}"
+        self.out_path = output_paths[(package, target)]
+        self.resolve = resolve
+        self.cc_dependencies = cc_dependencies
         self.path = build_root.joinpath(
             mk_target_build_path(package=package, target=target)
         )
@@ -79,28 +108,16 @@ class TargetMk:
 
     @property
     def requires_linking(self):
-        return isinstance(self.target, CCBinary)
-
-    @property
-    def out_path(self):
-        if isinstance(self.target, CCLibrary):
-            return cc_library_output_path(
-                config=self.config, package=self.package, target=self.target
-            )
-        elif isinstance(self.target, CCBinary):
-            return cc_binary_output_path(
-                config=self.config, package=self.package, target=self.target
-            )
-        else:
-            raise RuntimeError(f"unknown target type {type(self.target)}")
+        return self.is_binary
 
     def var_name(self, prefix: str):
-        return f"{prefix}__{self.package.name.replace('/','_')}__{self.target.name}"
+        return f"{prefix}__{self.var_suffix}"
 
     def __call__(self):
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.path, "w") as file:
-            self._write_makefile(file)
+        file = StringIO()
+        self._write_makefile(file)
+        write_if_changed(self.path, file.getvalue())
 
     def _write_makefile(self, file):
         # pick some variable names...
@@ -113,40 +130,6 @@ class TargetMk:
         objs_var = self.var_name("OBJS")
         deps_var = self.var_name("DEPS")
 
-        # entire dependency tree
-        all_dependencies = [
-            (p, t)
-            for p, t in self.workspace.all_dependencies(
-                package=self.package, target=self.target
-            )
-        ]
-
-        # sort dependencies
-        sorter: TopologicalSorter = TopologicalSorter()
-        for p, t in all_dependencies:
-            sorter.add(
-                target_full_name(p, t),
-                *[
-                    target_full_name(dp, dt)
-                    for dp, dt in self.workspace.direct_dependencies(
-                        package=p, target=t
-                    )
-                ],
-            )
-        all_dependencies = list(
-            reversed(
-                [
-                    self.workspace.find_target(name=dep, outer=self.package)
-                    for dep in sorter.static_order()
-                ]
-            )
-        )
-
-        # filter dependencies...
-        all_dependencies = [
-            (p, t) for p, t in all_dependencies if isinstance(t, CCLibrary)
-        ]
-
         # header
         file.writelines(
             [
@@ -169,9 +152,7 @@ class TargetMk:
                 f"{srcs_var} :=",
                 *[
                     f" \\\n  {Path(os.path.relpath(src, self.workspace.root)).as_posix()}"
-                    for src in resolve_conditionals(
-                        config=self.config, value=self.target.srcs
-                    )
+                    for src in self.resolve(self.target.srcs)
                     if os.path.splitext(src)[-1] in COMPILE_EXTS
                 ],
                 "\n\n",
@@ -179,59 +160,39 @@ class TargetMk:
         )
 
         # private includes
-        includes = list(
-            resolve_conditionals(config=self.config, value=self.target.private_includes)
-        )
+        includes = list(self.resolve(self.target.private_includes))
         # public includes
-        if isinstance(self.target, CCLibrary):
-            includes.extend(
-                resolve_conditionals(
-                    config=self.config, value=self.target.public_includes
-                )
-            )
+        if self.is_library:
+            includes.extend(self.resolve(self.target.public_includes))
         # dependency includes
         includes.extend(
-            [
-                i
-                for _, dep_t in all_dependencies
-                for i in resolve_conditionals(
-                    config=self.config, value=dep_t.public_includes
-                )
-            ]
+            i
+            for _, dep_t in self.cc_dependencies
+            for i in self.resolve(dep_t.public_includes)
         )
         file.writelines(
             [
                 f"{includes_var} :=",
-                *[f" \\\n  {i}" for i in includes],
+                *[f" \\\n  {i}" for i in dict.fromkeys(includes)],
                 "\n\n",
             ]
         )
 
         # preprocessor defines
-        defines = [
-            *resolve_conditionals(config=self.config, value=self.target.private_defines)
-        ]
-        if isinstance(self.target, CCLibrary):
-            defines.extend(
-                resolve_conditionals(
-                    config=self.config, value=self.target.public_defines
-                )
-            )
+        defines = [*self.resolve(self.target.private_defines)]
+        if self.is_library:
+            defines.extend(self.resolve(self.target.public_defines))
         defines.extend(
-            [
-                define
-                for _, dep_target in self.workspace.all_dependencies(
-                    self.package, self.target
-                )
-                if isinstance(dep_target, CCLibrary)
-                for define in resolve_conditionals(
-                    config=self.config, value=dep_target.public_defines
-                )
-            ]
+            define
+            for _, dep_target in self.workspace.all_dependencies(
+                self.package, self.target
+            )
+            if isinstance(dep_target, CCLibrary)
+            for define in self.resolve(dep_target.public_defines)
         )
         file.writelines(
             [
-                f"{defines_var} := {' '.join(defines)}\n",
+                f"{defines_var} := {' '.join(dict.fromkeys(defines))}\n",
                 "\n",
             ]
         )
@@ -240,8 +201,8 @@ class TargetMk:
         archflags = PLATFORM_ARCH_FLAGS[self.config.platform][self.config.architecture]
 
         # compiler flags
-        cflags = resolve_conditionals(config=self.config, value=self.target.c_flags)
-        cxxflags = resolve_conditionals(config=self.config, value=self.target.cxx_flags)
+        cflags = self.resolve(self.target.c_flags)
+        cxxflags = self.resolve(self.target.cxx_flags)
         file.writelines(
             [
                 f"{cflags_var}   := {archflags} {' '.join(cflags)}\n",
@@ -253,7 +214,7 @@ class TargetMk:
         # linker flags
         if self.requires_linking:
             lflags = [
-                *resolve_conditionals(config=self.config, value=self.target.link_flags),
+                *self.resolve(self.target.link_flags),
             ]
             file.writelines(
                 [
@@ -280,7 +241,7 @@ class TargetMk:
         )
 
         # output target...
-        if isinstance(self.target, CCLibrary):
+        if self.is_library:
             file.writelines(
                 [
                     f"{self.out_path}: $({objs_var})\n",
@@ -291,10 +252,10 @@ class TargetMk:
                     "\n",
                 ]
             )
-        elif isinstance(self.target, CCBinary):
+        elif self.is_binary:
             dep_libs = [
-                cc_library_output_path(config=self.config, package=dep_p, target=dep_t)
-                for dep_p, dep_t in all_dependencies
+                self.output_paths[(dep_p, dep_t)]
+                for dep_p, dep_t in self.cc_dependencies
                 if not is_header_only_library(dep_t)
             ]
             file.writelines(
@@ -309,7 +270,7 @@ class TargetMk:
             raise RuntimeError(f"unknown target type {type(self.target)}")
 
         # .c rule
-        for ext in CC_EXTS:
+        for ext in sorted(CC_EXTS):
             file.writelines(
                 [
                     f"$(filter %{ext}.o,$({objs_var})): $(OBJS_ROOT)/%.o: $(WORKSPACE_ROOT)/%\n",
@@ -321,7 +282,7 @@ class TargetMk:
             )
 
         # .cpp rule
-        for ext in CXX_EXTS:
+        for ext in sorted(CXX_EXTS):
             file.writelines(
                 [
                     f"$(filter %{ext}.o,$({objs_var})): $(OBJS_ROOT)/%.o: $(WORKSPACE_ROOT)/%\n",
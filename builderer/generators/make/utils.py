@@ -1,8 +1,28 @@
+from graphlib import TopologicalSorter
 from pathlib import Path
 
+from builderer.details.targets.cc_binary import CCBinary
 from builderer.details.targets.cc_library import CCLibrary
 from builderer.details.variable_expansion import resolve_conditionals
 
+APPLE_PLATFORMS = {
+    "macos",
+    "ios",
+}
+
+
+def write_if_changed(path: Path, contents: str):
+    # Check if previous version matches and early exit to avoid bumping timestamps unnecessarily...
+    try:
+        with path.open("r") as f:
+            if f.read() == contents:
+                return
+    except FileNotFoundError:
+        pass
+    # Write new contents if needed...
+    with path.open("w") as f:
+        f.write(contents)
+
 
 def build_config_root(build_root: str, arch: str, config: str) -> str:
     return f"{build_root}/{arch}/{config}"
@@ -24,10 +44,6 @@ def is_header_only_library(target):
 
 
 def is_apple_platform(platform_name: str):
-    APPLE_PLATFORMS = {
-        "macos",
-        "ios",
-    }
     return platform_name in APPLE_PLATFORMS
 
 
@@ -44,3 +60,25 @@ def cc_binary_output_path(config, package, target):
     if output_path:
         return f"$(WORKSPACE_ROOT)/{output_path}"
     return f"$(RUNTIME_ROOT)/{package.name}/{target.name}"
+
+
+def cc_output_path(config, package, target):
+    if isinstance(target, CCLibrary):
+        return cc_library_output_path(config=config, package=package, target=target)
+    elif isinstance(target, CCBinary):
+        return cc_binary_output_path(config=config, package=package, target=target)
+    else:
+        raise RuntimeError(f"unknown target type {type(target)}")
+
+
+# All C/C++ library dependencies of a target, sorted so that each library comes
+# before the libraries it depends on (i.e. static link order)...
+def sorted_cc_dependencies(workspace, package, target):
+    sorter: TopologicalSorter = TopologicalSorter()
+    for p, t in workspace.all_dependencies(package=package, target=target):
+        sorter.add((p, t), *workspace.direct_dependencies(package=p, target=t))
+    return [
+        (p, t)
+        for p, t in reversed(list(sorter.static_order()))
+        if isinstance(t, CCLibrary)
+    ]
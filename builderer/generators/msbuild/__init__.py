@@ -3,8 +3,9 @@ from typing import List
 from builderer import Config
 from builderer.details.as_iterator import str_iter
 from builderer.details.targets.target import BuildTarget
+from builderer.details.variable_expansion import ConditionalResolver
 from builderer.details.workspace import Workspace, target_full_name
-from builderer.generators.msbuild.project import MsBuildProject
+from builderer.generators.msbuild.project import MsBuildProject, bake_config
 from builderer.generators.msbuild.solution import MsBuildSolution
 
 SUPPORTED_TOOLCHAINS = ["msvc"]
@@ -26,12 +27,21 @@ class MsBuildGenerator:
                 raise ValueError(f"unsupported architecture {arch}")
 
     def __call__(self):
+        # Baked configs are the same for every project, build them once...
+        build_configs = [
+            bake_config(config=self.config, architecture=a, build_config=c)
+            for a in str_iter(self.config.architecture)
+            for c in str_iter(self.config.build_config)
+        ]
+        resolvers = {config: ConditionalResolver(config) for config in build_configs}
         projects = {
             target_full_name(pkg, target): MsBuildProject(
                 config=self.config,
                 workspace=self.workspace,
                 package=pkg,
                 target=target,
+                build_configs=build_configs,
+                resolvers=resolvers,
             )
             for pkg in self.workspace.packages.values()
             for target in pkg.targets.values()
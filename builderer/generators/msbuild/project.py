@@ -1,19 +1,24 @@
 import os
 
 from copy import deepcopy
+from itertools import chain
 from pathlib import Path
-from typing import TextIO, List
+from typing import Dict, Iterable, TextIO, List
 from xml.dom.minidom import Node, Document, Element
 
 from builderer import Config
-from builderer.details.as_iterator import str_iter
 from builderer.details.package import Package
 from builderer.details.targets.cc_binary import CCBinary
 from builderer.details.targets.cc_library import CCLibrary
 from builderer.details.targets.target import BuildTarget
-from builderer.details.variable_expansion import resolve_conditionals
+from builderer.details.variable_expansion import ConditionalResolver
 from builderer.details.workspace import Workspace
-from builderer.generators.msbuild.utils import as_msft_path, make_guid, msvc_file_rule
+from builderer.generators.msbuild.utils import (
+    as_msft_path,
+    make_guid,
+    msft_relpath,
+    msvc_file_rule,
+)
 
 
 def owner_doc(xnode: Node) -> Document:
@@ -70,16 +75,16 @@ def get_project_root(config: Config, target: BuildTarget):
     return Path(config.build_root).joinpath(target.workspace_root)
 
 
-def get_project_to_target(config: Config, target: BuildTarget):
-    return Path(os.path.relpath(target.root, get_project_root(config, target)))
+def get_project_to_target(project_root: Path, target: BuildTarget):
+    return Path(os.path.relpath(target.root, project_root))
 
 
-def get_vcxproj_path(config: Config, target: BuildTarget):
-    return get_project_root(config, target).joinpath(f"{target.name}.vcxproj")
+def get_vcxproj_path(project_root: Path, target: BuildTarget):
+    return project_root.joinpath(f"{target.name}.vcxproj")
 
 
-def get_filters_path(config: Config, target: BuildTarget):
-    return get_project_root(config, target).joinpath(f"{target.name}.vcxproj.filters")
+def get_filters_path(project_root: Path, target: BuildTarget):
+    return project_root.joinpath(f"{target.name}.vcxproj.filters")
 
 
 def bake_config(config: Config, architecture: str, build_config: str):
@@ -89,16 +94,9 @@ def bake_config(config: Config, architecture: str, build_config: str):
     return config
 
 
-def unique_list(l: list):
-    seen: set = set()
-
-    def visit(x):
-        if x not in seen:
-            seen.add(x)
-            return True
-        return False
-
-    return [x for x in l if visit(x)]
+def unique_list(l: Iterable):
+    # dict preserves insertion order, so this keeps the first occurrence
+    return list(dict.fromkeys(l))
 
 
 # Mapping of known compiler flags to MSBuild settings...
@@ -193,6 +191,21 @@ DEFAULT_LINK_SETTINGS = {
 }
 
 
+# Split flags into MSBuild settings (starting from defaults) and the remaining
+# unknown flags that need to be passed through, in a single pass...
+def parse_flags(flags: list, mapping: dict, defaults: dict):
+    settings = defaults.copy()
+    unknown_flags = []
+    for flag in flags:
+        setting = mapping.get(flag)
+        if setting is None:
+            unknown_flags.append(flag)
+        else:
+            opt_name, opt_value = setting
+            settings[opt_name] = opt_value
+    return settings, unknown_flags
+
+
 class MsBuildProject:
     PROJECT_TOOLS_VERSION = "17.0"
     FILTERS_TOOLS_VERSION = "4.0"
@@ -200,6 +213,12 @@ class MsBuildProject:
     PLATFORM_TOOLSET = "v143"
     WINDOWS_TARGET_PLATFORM_VERSION = "10.0"
     CHARACTER_SET = "Unicode"
+    LIBRARY_OUT_DIR = (
+        "$(ProjectDir)\\.lib\\$(MSBuildProjectName)\\$(Platform)-$(Configuration)\\"
+    )
+    INTERMEDIATE_DIR = (
+        "$(ProjectDir)\\.obj\\$(MSBuildProjectName)\\$(Platform)-$(Configuration)\\"
+    )
 
     def __init__(
         self,
@@ -207,21 +226,36 @@ class MsBuildProject:
         workspace: Workspace,
         package: Package,
         target: BuildTarget,
+        build_configs: list,
+        resolvers: Dict[Config, ConditionalResolver],
     ):
         self.base_config = config
         self.workspace = workspace
         self.package = package
         self.target = target
+        self.is_library = isinstance(target, CCLibrary)
+        self.is_binary = isinstance(target, CCBinary)
         self.project_root = get_project_root(config, target)
-        self.target_root = get_project_to_target(config, target)
-        self.vcxproj_path = get_vcxproj_path(config, target)
-        self.filters_path = get_filters_path(config, target)
+        self.target_root = get_project_to_target(self.project_root, target)
+        self.vcxproj_path = get_vcxproj_path(self.project_root, target)
+        self.filters_path = get_filters_path(self.project_root, target)
         self.project_guid = get_project_guid(target)
-        self.build_configs = [
-            bake_config(config=self.base_config, architecture=a, build_config=c)
-            for a in str_iter(self.base_config.architecture)
-            for c in str_iter(self.base_config.build_config)
-        ]
+        self.build_configs = build_configs
+        self.resolvers = resolvers
+        self.config_conditions = {
+            config: f"'$(Configuration)|$(Platform)'=='{config.build_config}|{config.architecture}'"
+            for config in build_configs
+        }
+        # Configuration properties shared by all build configs, copied and
+        # patched with per-config values as each config is emitted...
+        self.config_properties = {
+            "ConfigurationType": self.configuration_type,
+            "UseDebugLibraries": "true",  # TODO
+            "PlatformToolset": self.PLATFORM_TOOLSET,
+            "CharacterSet": self.CHARACTER_SET,
+            "OutDir": self.LIBRARY_OUT_DIR,
+            "IntDir": self.INTERMEDIATE_DIR,
+        }
 
     def __call__(self):
         self.project_root.mkdir(parents=True, exist_ok=True)
@@ -267,12 +301,8 @@ class MsBuildProject:
         xgroup = append_element(xproj, "ItemGroup")
         for file in all_files:
             xfile = append_element(xgroup, msvc_file_rule(file))
-            xfile.setAttribute(
-                "Include", as_msft_path(os.path.relpath(file, self.project_root))
-            )
-            append_text_element(
-                xfile, "Filter", as_msft_path(os.path.relpath(file.parent, common_dir))
-            )
+            xfile.setAttribute("Include", msft_relpath(file, self.project_root))
+            append_text_element(xfile, "Filter", msft_relpath(file.parent, common_dir))
         # write
         write_xml_to_path(xdoc, self.filters_path)
 
@@ -288,11 +318,11 @@ class MsBuildProject:
 
     @property
     def requires_comnpiling(self):
-        return isinstance(self.target, (CCLibrary, CCBinary))
+        return self.is_library or self.is_binary
 
     @property
     def requires_linking(self):
-        return isinstance(self.target, CCBinary)
+        return self.is_binary
 
     ### vcxproj support
 
@@ -329,10 +359,9 @@ class MsBuildProject:
             xref = append_element(xgroup, "ProjectReference")
             xref.setAttribute(
                 "Include",
-                as_msft_path(
-                    os.path.relpath(
-                        get_vcxproj_path(self.base_config, dep), self.project_root
-                    )
+                msft_relpath(
+                    get_vcxproj_path(get_project_root(self.base_config, dep), dep),
+                    self.project_root,
                 ),
             )
 
@@ -340,52 +369,28 @@ class MsBuildProject:
         xgroup = append_element(xparent, "ItemGroup")
         append_comment(xgroup, group_name)
         for file in files:
-            append_element(xgroup, msvc_file_rule(Path(file))).setAttribute(
-                "Include", as_msft_path(os.path.relpath(file, self.project_root))
+            append_element(xgroup, msvc_file_rule(file)).setAttribute(
+                "Include", msft_relpath(file, self.project_root)
             )
 
     def _append_config_properties(self, xparent: Node, config: Config):
         xgroup = append_element(xparent, "PropertyGroup")
-        xgroup.setAttribute(
-            "Condition",
-            f"'$(Configuration)|$(Platform)'=='{config.build_config}|{config.architecture}'",
-        )
+        xgroup.setAttribute("Condition", self.config_conditions[config])
         xgroup.setAttribute("Label", "Configuration")
-        append_text_element(xgroup, "ConfigurationType", self.configuration_type)
-        append_text_element(xgroup, "UseDebugLibraries", "true")  # TODO
-        append_text_element(xgroup, "PlatformToolset", self.PLATFORM_TOOLSET)
-        append_text_element(xgroup, "CharacterSet", self.CHARACTER_SET)
+        properties = self.config_properties.copy()
         if isinstance(self.target, CCBinary):
-            out_path = as_msft_path(
-                os.path.relpath(
-                    os.path.dirname(
-                        resolve_conditionals(
-                            config=config, value=self.target.output_path
-                        )
-                    ),
-                    self.project_root,
-                )
-            )
-            append_text_element(xgroup, "OutDir", f"$(ProjectDir)\\{out_path}\\")
-        else:
-            append_text_element(
-                xgroup,
-                "OutDir",
-                "$(ProjectDir)\\.lib\\$(MSBuildProjectName)\\$(Platform)-$(Configuration)\\",
+            out_path = msft_relpath(
+                os.path.dirname(self.resolvers[config](self.target.output_path)),
+                self.project_root,
             )
-        append_text_element(
-            xgroup,
-            "IntDir",
-            "$(ProjectDir)\\.obj\\$(MSBuildProjectName)\\$(Platform)-$(Configuration)\\",
-        )
+            properties["OutDir"] = f"$(ProjectDir)\\{out_path}\\"
+        for k, v in properties.items():
+            append_text_element(xgroup, k, v)
 
     def _append_local_app_data_platform(self, xparent: Node, config: Config):
         xsheet = append_element(xparent, "ImportGroup")
         xsheet.setAttribute("Label", "PropertySheets")
-        xsheet.setAttribute(
-            "Condition",
-            f"'$(Configuration)|$(Platform)'=='{config.build_config}|{config.architecture}'",
-        )
+        xsheet.setAttribute("Condition", self.config_conditions[config])
         xprop = append_element(xsheet, "Import")
         xprop.setAttribute(
             "Project", "$(UserRootDir)\Microsoft.Cpp.$(Platform).user.props"
@@ -397,10 +402,7 @@ class MsBuildProject:
 
     def _append_config_definition_group(self, xparent: Node, config: Config):
         xgroup = append_element(xparent, "ItemDefinitionGroup")
-        xgroup.setAttribute(
-            "Condition",
-            f"'$(Configuration)|$(Platform)'=='{config.build_config}|{config.architecture}'",
-        )
+        xgroup.setAttribute("Condition", self.config_conditions[config])
         if self.requires_comnpiling:
             self._append_compile_config(xgroup, config=config)
         if self.requires_linking:
@@ -409,93 +411,67 @@ class MsBuildProject:
     def _append_compile_config(self, xparent: Node, config: Config):
         assert isinstance(self.target, (CCLibrary, CCBinary))
         xcompile = append_element(xparent, "ClCompile")
+        resolve = self.resolvers[config]
         # Parse out compiler flags into settings when possible...
-        compile_settings = DEFAULT_COMPILE_SETTINGS.copy()
-        unknown_cflags = []
         compile_flags = unique_list(
-            resolve_conditionals(config=config, value=self.target.c_flags)
-            + resolve_conditionals(config=config, value=self.target.cxx_flags)
+            chain(resolve(self.target.c_flags), resolve(self.target.cxx_flags))
+        )
+        compile_settings, unknown_cflags = parse_flags(
+            compile_flags, CFLAG_MAPPING, DEFAULT_COMPILE_SETTINGS
         )
-        for cflag in compile_flags:
-            if cflag in CFLAG_MAPPING:
-                opt_name, opt_value = CFLAG_MAPPING[cflag]
-                compile_settings[opt_name] = opt_value
-            else:
-                unknown_cflags.append(cflag)
         # Apply compiler settings...
         for k, v in compile_settings.items():
             append_text_element(xcompile, k, v)
         # Remaining unknown compiler flags get passed through...
         append_text_element(xcompile, "AdditionalOptions", " ".join(unknown_cflags))
         # Defines...
-        defines = [
-            *resolve_conditionals(config=config, value=self.target.private_defines)
-        ]
+        defines = [*resolve(self.target.private_defines)]
         if isinstance(self.target, CCLibrary):
-            defines.extend(
-                resolve_conditionals(config=config, value=self.target.public_defines)
-            )
+            defines.extend(resolve(self.target.public_defines))
         defines.extend(
-            [
-                define
-                for _, dep_target in self.workspace.all_dependencies(
-                    self.package, self.target
-                )
-                if isinstance(dep_target, CCLibrary)
-                for define in resolve_conditionals(
-                    config=config, value=dep_target.public_defines
-                )
-            ]
+            define
+            for _, dep_target in self.workspace.all_dependencies(
+                self.package, self.target
+            )
+            if isinstance(dep_target, CCLibrary)
+            for define in resolve(dep_target.public_defines)
+        )
+        append_text_element(
+            xcompile, "PreprocessorDefinitions", ";".join(unique_list(defines))
         )
-        append_text_element(xcompile, "PreprocessorDefinitions", ";".join(defines))
         # Header search paths...
-        includes = []
-        if isinstance(self.target, (CCLibrary, CCBinary)):
-            includes.extend(
-                [
-                    as_msft_path(os.path.relpath(include, self.project_root))
-                    for include in resolve_conditionals(
-                        config=config, value=self.target.private_includes
-                    )
-                ]
-            )
+        includes = [*resolve(self.target.private_includes)]
         if isinstance(self.target, CCLibrary):
-            includes.extend(
-                [
-                    as_msft_path(os.path.relpath(include, self.project_root))
-                    for include in resolve_conditionals(
-                        config=config, value=self.target.public_includes
-                    )
-                ]
-            )
+            includes.extend(resolve(self.target.public_includes))
         includes.extend(
-            [
-                as_msft_path(os.path.relpath(include, self.project_root))
-                for _, dep_target in self.workspace.all_dependencies(
-                    self.package, self.target
-                )
-                if isinstance(dep_target, CCLibrary)
-                for include in resolve_conditionals(
-                    config=config, value=dep_target.public_includes
-                )
-            ]
+            include
+            for _, dep_target in self.workspace.all_dependencies(
+                self.package, self.target
+            )
+            if isinstance(dep_target, CCLibrary)
+            for include in resolve(dep_target.public_includes)
         )
         append_text_element(
-            xcompile, "AdditionalIncludeDirectories", ";".join(includes)
+            xcompile,
+            "AdditionalIncludeDirectories",
+            ";".join(
+                [
+                    msft_relpath(include, self.project_root)
+                    for include in unique_list(includes)
+                ]
+            ),
         )
 
     def _append_link_config(self, xparent: Node, config: Config):
         assert isinstance(self.target, CCBinary)
         xlink = append_element(xparent, "Link")
+        resolve = self.resolvers[config]
         # Parse out compiler flags into settings when possible...
-        link_settings = DEFAULT_LINK_SETTINGS.copy()
-        unknown_lflags = []
-        for cflag in resolve_conditionals(config=config, value=self.target.link_flags):
-            if cflag in LFLAG_MAPPING:
-                opt_name, opt_value = LFLAG_MAPPING[cflag]
-                link_settings[opt_name] = opt_value
-            else:
-                unknown_lflags.append(cflag)
+        link_settings, unknown_lflags = parse_flags(
+            resolve(self.target.link_flags),
+            LFLAG_MAPPING,
+            DEFAULT_LINK_SETTINGS,
+        )
         # Apply compiler settings...
         for k, v in link_settings.items():
             append_text_element(xlink, k, v)
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Dict
 
 from builderer import Config
+from builderer.details.as_iterator import str_iter
 from builderer.details.targets.target import BuildTarget
 from builderer.details.workspace import Workspace, target_full_name
 from builderer.generators.msbuild.project import MsBuildProject
@@ -34,6 +35,9 @@ class MsBuildSolution:
             self._write_solution(sln)
 
     def _write_solution(self, file: TextIOWrapper):
+        archs = list(str_iter(self.config.architecture))
+        build_configs = list(str_iter(self.config.build_config))
+
         # header
         file.writelines(
             [
@@ -60,11 +64,7 @@ class MsBuildSolution:
             if deps:
                 file.write("\tProjectSection(ProjectDependencies) = postProject\n")
                 for dep in deps:
-                    dep_name = target_full_name(dep.package, dep.target)
-                    dep_project = self.projects[dep_name]
-                    file.write(
-                        f"\t\t{dep_project.project_guid} = {dep_project.project_guid}\n"
-                    )
+                    file.write(f"\t\t{dep.project_guid} = {dep.project_guid}\n")
                 file.write("\tEndProjectSection\n")
             file.write(f"EndProject\n")
 
@@ -79,9 +79,10 @@ class MsBuildSolution:
             if parent != Path()
         }
         folders = sorted(target_roots | target_parents)
+        folder_guids = {folder: make_guid(as_msft_path(folder)) for folder in folders}
         for folder in folders:
             folder_name = folder.name
-            folder_guid = make_guid(as_msft_path(folder))
+            folder_guid = folder_guids[folder]
             file.writelines(
                 [
                     f'Project("{FOLDER_GUID}") = "{folder_name}", "{folder_name}", "{folder_guid}"\n'
@@ -94,16 +95,16 @@ class MsBuildSolution:
 
         # Solution Configurations
         file.write("\tGlobalSection(SolutionConfigurationPlatforms) = preSolution\n")
-        for arch in self.config.architecture:
-            for config in self.config.build_config:
+        for arch in archs:
+            for config in build_configs:
                 file.write(f"\t\t{config}|{arch} = {config}|{arch}\n")
         file.write("\tEndGlobalSection\n")
 
         # Project Configurations
         file.write("\tGlobalSection(ProjectConfigurationPlatforms) = postSolution\n")
         for project in self.projects.values():
-            for arch in self.config.architecture:
-                for config in self.config.build_config:
+            for arch in archs:
+                for config in build_configs:
                     file.writelines(
                         [
                             f"\t\t{project.project_guid}.{config}|{arch}.ActiveCfg = {config}|{arch}\n",
@@ -115,14 +116,13 @@ class MsBuildSolution:
         # Package nesting
         file.write("\tGlobalSection(NestedProjects) = preSolution\n")
         for project in self.projects.values():
-            file.write(
-                f"\t\t{project.project_guid} = {make_guid(as_msft_path(project.target.workspace_root))}\n"
-            )
+            folder_guid = folder_guids[Path(project.target.workspace_root)]
+            file.write(f"\t\t{project.project_guid} = {folder_guid}\n")
         for folder in folders:
             folder_parent = folder.parent
             if folder_parent != Path():
                 file.write(
-                    f"\t\t{make_guid(as_msft_path(folder))} = {make_guid(as_msft_path(folder_parent))}\n"
+                    f"\t\t{folder_guids[folder]} = {folder_guids[folder_parent]}\n"
                 )
         file.write("\tEndGlobalSection\n")
 
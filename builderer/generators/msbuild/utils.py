@@ -1,21 +1,37 @@
+import os
 import uuid
 
+from functools import lru_cache
 from pathlib import Path, PureWindowsPath
-from typing import Union
+from typing import Optional, Union
 
 
 def as_msft_path(path: Union[str, Path]) -> str:
     return str(PureWindowsPath(path))
 
 
+@lru_cache(maxsize=None)
+def msft_relpath(path: Union[str, Path], start: Union[str, Path]) -> str:
+    return as_msft_path(os.path.relpath(path, start))
+
+
 def make_guid(key: str) -> str:
     return f"{{{uuid.uuid5(uuid.NAMESPACE_X500, key)}}}".upper()
 
 
-def msvc_file_rule(path: Path) -> str:
-    if path.suffix.lower() in [".cpp", ".cc", ".c"]:
+@lru_cache(maxsize=None)
+def msvc_extension_rule(suffix: str) -> Optional[str]:
+    suffix = suffix.lower()
+    if suffix in {".cpp", ".cc", ".c"}:
         return "ClCompile"
-    elif path.suffix.lower() in [".h", ".hpp", ".inl"]:
+    elif suffix in {".h", ".hpp", ".inl"}:
         return "ClInclude"
     else:
+        return None
+
+
+def msvc_file_rule(path: Union[str, Path]) -> str:
+    rule = msvc_extension_rule(os.path.splitext(path)[1])
+    if rule is None:
         raise ValueError(f"Unsupported file extension for {path}")
+    return rule